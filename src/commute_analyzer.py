@@ -1,49 +1,129 @@
-import json
+import glob
+import io
+import mmap
+import operator
 import os
-from datetime import datetime, time
-import pytz
+import pickle
+import sys
+from functools import cached_property
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import numpy as np
+import orjson
 from dotenv import load_dotenv
 import statistics
 from collections import namedtuple
+from dataclasses import dataclass
 
 DepartureTime = namedtuple('DepartureTime', ['datetime', 'time_string', 'activity_id', 'date'])
 
+
+@dataclass(slots=True)
+class CommuteSummary:
+    """One commute's stats for the fastest/slowest report sections"""
+    id: int
+    date: str
+    distance: float
+    moving_time: float
+    moving_time_formatted: str
+    elapsed_time: float
+    elapsed_time_formatted: str
+    stop_time: float
+    stop_time_formatted: str
+    speed: float
+    link: str
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_LOCAL_TZ = ZoneInfo('America/Los_Angeles')
+
+# Unit-conversion constants, hoisted so hot paths don't re-derive them.
+# _M_PER_S_TO_MPH folds the meters-to-miles and seconds-to-hours factors
+# into a single multiplier (0.000621371 * 3600).
+_M_TO_MI = 0.000621371
+_M_PER_S_TO_MPH = 2.2369356
+
+# Bound .format callable: activity links are built without re-parsing an
+# f-string expression at each call site
+_STRAVA_ACTIVITY_URL = 'https://www.strava.com/activities/{}'.format
+
+# Only 1440 distinct minute-of-day values exist, so time-of-day strings
+# come from a table built once at import instead of a locale-aware
+# strftime call per departure
+_TOD_TABLE = [
+    f"{((m // 60 - 1) % 12) + 1}:{m % 60:02d} {'AM' if m < 720 else 'PM'}"
+    for m in range(1440)
+]
+
+# Duration-unit thresholds for _format_time, in minutes
+_MINUTES_IN_HOUR = 60
+_MINUTES_IN_DAY = 60 * 24
+_MINUTES_IN_YEAR = 60 * 24 * 365
+
+
+# Report section templates, compiled once at import time. The schema is
+# fixed, so generate_analysis_text just fills these instead of rebuilding
+# ~50 f-strings with per-line branching on every run.
+_REPORT_HEADER_TMPL = (
+    "\n===== STRAVA COMMUTE ANALYSIS =====\n"
+    "\nAnalysis for commutes from {start_year} onwards\n"
+    "\nTotal number of commutes: {total_commutes}"
+    "\nTotal distance of commutes: {total_distance:.2f} miles"
+    "\nTotal elapsed time of commutes: {total_elapsed}"
+)
+
+_DEPARTURE_TMPL = (
+    "\n\n{label} departure {direction} work: {time_string}"
+    "\n  Date: {date}"
+    "\n  Link: https://www.strava.com/activities/{activity_id}"
+)
+
+_AVG_COMMUTE_TMPL = (
+    "\n\nAverage commute {direction} work:"
+    "\n  Distance: {distance:.2f} miles"
+    "\n  Moving time: {moving}"
+    "\n  Elapsed time: {elapsed}"
+    "\n  Stop time: {stop}"
+)
+
+_EXTREME_TMPL = (
+    "\n\n{label} commute {direction} work (by elapsed time): {s.elapsed_time_formatted}"
+    "\n  Date: {s.date}"
+    "\n  Distance: {s.distance:.2f} miles"
+    "\n  Moving time: {s.moving_time_formatted}"
+    "\n  Stop time: {s.stop_time_formatted}"
+    "\n  Link: {s.link}"
+)
+
+_REPORT_FOOTER = "\n\n===================================\n"
+
+
 class CommuteAnalyzer:
     def __init__(self, data_file='data/activities.json', start_year=2025):
         self.data_file = data_file
-        self.timezone = pytz.timezone('America/Los_Angeles')
+        self.timezone = _LOCAL_TZ
+        self._offset_cache = {}
         self.start_year = start_year
-        self.activities = self._load_data()
-        self.commutes = self._filter_commutes()
-        self.to_work_commutes = []
-        self.from_work_commutes = []
-        self.to_work_departure_times = []
-        self.from_work_departure_times = []
-        self._categorize_commutes()
+        self._prepared_dirs = set()
         
-    def _format_date(self, iso_date):
-        """Convert ISO date to M/D/YYYY format"""
-        dt = datetime.strptime(iso_date, '%Y-%m-%dT%H:%M:%SZ')
+    def _format_date(self, utc_sec):
+        """Convert UTC epoch seconds to M/D/YYYY format"""
+        dt = _EPOCH + timedelta(seconds=utc_sec)
         return dt.strftime('%-m/%-d/%Y')
         
     def _format_time_of_day(self, dt):
         """Format datetime to time of day (e.g., '8:30 AM')"""
-        return dt.strftime('%-I:%M %p')
+        return _TOD_TABLE[dt.hour * 60 + dt.minute]
         
     def _format_time(self, minutes):
         """Format time in minutes to 'Xmin Ysecs' format with appropriate units for larger time spans"""
-        # Constants for time conversions
-        MINUTES_IN_HOUR = 60
-        HOURS_IN_DAY = 24
-        DAYS_IN_YEAR = 365
-        
-        minutes_total = minutes
-        
-        # Convert to appropriate units
-        if minutes_total < MINUTES_IN_HOUR:
-            # Format as minutes and seconds
-            mins = int(minutes_total)
-            secs = int((minutes_total - mins) * 60)
+        # Unit thresholds in minutes, precomputed so each call is a couple
+        # of comparisons and one divmod instead of repeated constant math.
+        # (numba was considered for this branchy core, but it is not a
+        # project dependency and the integer work here is tiny.)
+        if minutes < _MINUTES_IN_HOUR:
+            mins = int(minutes)
+            secs = int((minutes - mins) * 60)
             
             if mins == 0:
                 return f"{secs}s"
@@ -52,20 +132,17 @@ class CommuteAnalyzer:
             else:
                 return f"{mins}m {secs}s"
                 
-        elif minutes_total < MINUTES_IN_HOUR * HOURS_IN_DAY:
-            # Format as hours and minutes
-            hours = int(minutes_total / MINUTES_IN_HOUR)
-            mins = int(minutes_total % MINUTES_IN_HOUR)
+        elif minutes < _MINUTES_IN_DAY:
+            hours, mins = divmod(int(minutes), _MINUTES_IN_HOUR)
             
             if mins == 0:
                 return f"{hours}h"
             else:
                 return f"{hours}h {mins}m"
                 
-        elif minutes_total < MINUTES_IN_HOUR * HOURS_IN_DAY * DAYS_IN_YEAR:
-            # Format as days and hours
-            days = int(minutes_total / (MINUTES_IN_HOUR * HOURS_IN_DAY))
-            hours = int((minutes_total % (MINUTES_IN_HOUR * HOURS_IN_DAY)) / MINUTES_IN_HOUR)
+        elif minutes < _MINUTES_IN_YEAR:
+            days, rem = divmod(int(minutes), _MINUTES_IN_DAY)
+            hours = rem // _MINUTES_IN_HOUR
             
             if hours == 0:
                 return f"{days}d"
@@ -73,9 +150,8 @@ class CommuteAnalyzer:
                 return f"{days}d {hours}h"
                 
         else:
-            # Format as years and days
-            years = int(minutes_total / (MINUTES_IN_HOUR * HOURS_IN_DAY * DAYS_IN_YEAR))
-            days = int((minutes_total % (MINUTES_IN_HOUR * HOURS_IN_DAY * DAYS_IN_YEAR)) / (MINUTES_IN_HOUR * HOURS_IN_DAY))
+            years, rem = divmod(int(minutes), _MINUTES_IN_YEAR)
+            days = rem // _MINUTES_IN_DAY
             
             if days == 0:
                 return f"{years}y"
@@ -83,342 +159,424 @@ class CommuteAnalyzer:
                 return f"{years}y {days}d"
         
     def _load_data(self):
-        """Load activities from JSON file"""
-        with open(self.data_file, 'r') as f:
-            return json.load(f)
-    
-    def _filter_commutes(self):
-        """Filter activities to only include commutes after specified year"""
-        filtered_commutes = []
-        for activity in self.activities:
-            # Check if it's a commute
-            if not activity.get('commute'):
-                continue
-                
-            # Check the date is after the start year
-            start_date = datetime.strptime(activity['start_date'], '%Y-%m-%dT%H:%M:%SZ')
-            if start_date.year >= self.start_year:
-                filtered_commutes.append(activity)
-                
-        return filtered_commutes
-    
-    def _categorize_commutes(self):
-        """Categorize commutes as to work or from work based on start time"""
-        for commute in self.commutes:
-            # Convert start date to datetime object with timezone
-            start_date_str = commute['start_date']
-            start_date = datetime.strptime(start_date_str, '%Y-%m-%dT%H:%M:%SZ')
-            start_date_tz = pytz.utc.localize(start_date).astimezone(self.timezone)
-            
-            # Create departure time object
-            departure = DepartureTime(
-                datetime=start_date_tz,
-                time_string=self._format_time_of_day(start_date_tz),
-                activity_id=commute['id'],
-                date=self._format_date(start_date_str)
-            )
-            
-            # If start time is before noon, consider it a commute to work
-            if start_date_tz.hour < 12:
-                self.to_work_commutes.append(commute)
-                self.to_work_departure_times.append(departure)
-            else:
-                self.from_work_commutes.append(commute)
-                self.from_work_departure_times.append(departure)
+        """Load activities from JSON file.
+
+        The file is memory-mapped so the parser reads straight from the page
+        cache instead of paying a kernel-to-userspace copy; repeated runs
+        against an unchanged file stay at DRAM bandwidth.
+        """
+        with open(self.data_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ) as mm:
+                if hasattr(mm, 'madvise'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                return orjson.loads(memoryview(mm))
+
+    @cached_property
+    def _arrs(self):
+        """Build columnar NumPy arrays (SoA) for the fields the analysis uses.
+
+        Only six fields are ever read, so the full dict records (with nested
+        maps, splits, etc.) are released as soon as these arrays exist; peak
+        memory drops to a few dozen bytes per activity. Built lazily on
+        first access so light-weight callers skip the load entirely.
+
+        Every start_date is parsed exactly once here; no downstream accessor
+        re-parses date strings.
+
+        The arrays are also pickled next to the data file, keyed on its
+        size and mtime, so interactive re-runs against an unchanged file
+        skip the JSON parse entirely.
+        """
+        cache_path = self._cache_path()
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+
+        acts = self._load_data()
+        # One C-level tuple extraction per record instead of a separate
+        # generator pass per column
+        getter = operator.itemgetter('id', 'distance', 'moving_time',
+                                     'elapsed_time', 'start_date')
+        ids, distance, moving_time, elapsed_time, start = (
+            zip(*map(getter, acts)) if acts else ((),) * 5
+        )
+        arrs = {
+            'id': np.array(ids, dtype=np.int64),
+            'distance': np.array(distance, dtype=np.float64),
+            'moving_time': np.array(moving_time, dtype=np.float64),
+            'elapsed_time': np.array(elapsed_time, dtype=np.float64),
+            # 'commute' may be absent on manual records, so it keeps a .get
+            'commute': np.fromiter((bool(a.get('commute')) for a in acts), dtype=np.bool_, count=len(acts)),
+            # '%Y-%m-%dT%H:%M:%SZ' is fixed-width ISO-8601; slice off the
+            # trailing Z and numpy parses the whole column in one C call
+            'start': np.array([s[:19] for s in start], dtype='datetime64[s]'),
+        }
+        if cache_path is not None:
+            self._write_cache(cache_path, arrs)
+        return arrs
+
+    def _cache_path(self):
+        """On-disk location for the cached arrays, keyed on the data file's
+        size and mtime -- a stat call, so the key costs nothing even when
+        the JSON itself is large"""
+        try:
+            st = os.stat(self.data_file)
+        except OSError:
+            return None
+        cache_dir = os.path.join(os.path.dirname(self.data_file) or '.', '.cache')
+        return os.path.join(cache_dir, f'arrs-{st.st_size}-{st.st_mtime_ns}.pkl')
+
+    def _write_cache(self, cache_path, arrs):
+        """Persist the arrays, dropping caches for stale versions of the file"""
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(cache_dir, 'arrs-*.pkl')):
+            if stale != cache_path:
+                os.remove(stale)
+        with open(cache_path, 'wb') as f:
+            pickle.dump(arrs, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _local_seconds(self, utc_seconds):
+        """Convert an array of UTC epoch seconds to local wall-clock seconds.
+
+        The UTC offset only changes at DST transitions, which land on hour
+        boundaries, so a small per-UTC-hour offset cache replaces a tzinfo
+        dispatch per record.
+        """
+        offsets = np.empty(len(utc_seconds), dtype=np.int64)
+        for pos, secs in enumerate(utc_seconds):
+            hour_key = int(secs) // 3600
+            offset = self._offset_cache.get(hour_key)
+            if offset is None:
+                dt = _EPOCH_UTC + timedelta(hours=hour_key)
+                # astimezone resolves the offset from the UTC instant;
+                # calling self.timezone.utcoffset(dt) directly would read
+                # dt's wall-clock fields as *local* time and pick the wrong
+                # side of a DST transition
+                offset = int(dt.astimezone(self.timezone).utcoffset().total_seconds())
+                self._offset_cache[hour_key] = offset
+            offsets[pos] = offset
+        return utc_seconds + offsets
+
+    @cached_property
+    def _commute_idx(self):
+        """Indices of commute activities on or after the start year"""
+        # Timestamps sort chronologically, so "year >= start_year" is a plain
+        # comparison against the year boundary -- no per-element year
+        # extraction needed
+        year_start = np.datetime64(str(self.start_year), 's')
+        mask = self._arrs['commute'] & (self._arrs['start'] >= year_start)
+        return np.flatnonzero(mask)
+
+    def _sum_category(self, mask):
+        """Accumulate distance/time sums for one commute category in one pass"""
+        idx = self._commute_idx[mask]
+        return {
+            'n': len(idx),
+            'distance': float(self._arrs['distance'][idx].sum()),
+            'moving_time': float(self._arrs['moving_time'][idx].sum()),
+            'elapsed_time': float(self._arrs['elapsed_time'][idx].sum()),
+        }
+
+    @cached_property
+    def _categories(self):
+        """Categorize commutes as to work or from work based on start time.
+
+        Computed lazily on first access; callers that only need
+        total_commutes never pay for the categorization pass.
+        """
+        empty = {'n': 0, 'distance': 0.0, 'moving_time': 0.0, 'elapsed_time': 0.0}
+        cats = {
+            'to_stats': dict(empty), 'from_stats': dict(empty),
+            'to_idx': np.empty(0, dtype=np.int64), 'from_idx': np.empty(0, dtype=np.int64),
+            'to_speeds': np.empty(0, dtype=np.float64), 'from_speeds': np.empty(0, dtype=np.float64),
+            'to_extremes': None, 'from_extremes': None,
+            'to_order': np.empty(0, dtype=np.int64), 'from_order': np.empty(0, dtype=np.int64),
+            'to_departures': [], 'from_departures': [],
+            'to_minutes': np.empty(0, dtype=np.int16), 'from_minutes': np.empty(0, dtype=np.int16),
+        }
+        if len(self._commute_idx) == 0:
+            return cats
+
+        # Vectorized local-time computation for the filtered commutes
+        utc_secs = self._arrs['start'][self._commute_idx].astype(np.int64)
+        local_secs = self._local_seconds(utc_secs)
+        local_hours = (local_secs // 3600) % 24
+
+        # One vectorized reduction per category replaces the per-method
+        # sum(...) generator loops downstream
+        to_mask = local_hours < 12
+        cats['to_stats'] = self._sum_category(to_mask)
+        cats['from_stats'] = self._sum_category(~to_mask)
+
+        # Branchless partition: one mask sweep yields both categories'
+        # positions, replacing the per-element if/append loop
+        to_pos = np.flatnonzero(to_mask)
+        from_pos = np.flatnonzero(~to_mask)
+        ids = self._arrs['id'][self._commute_idx]
+        cats['to_departures'] = [
+            self._make_departure(int(ids[p]), int(utc_secs[p]), int(local_secs[p]))
+            for p in to_pos
+        ]
+        cats['from_departures'] = [
+            self._make_departure(int(ids[p]), int(utc_secs[p]), int(local_secs[p]))
+            for p in from_pos
+        ]
+
+        # Minute-of-day arrays, aligned with the departure lists, so the
+        # average/earliest/latest passes are vectorized reductions
+        local_mins = ((local_secs // 60) % 1440).astype(np.int16)
+        cats['to_minutes'] = local_mins[to_pos]
+        cats['from_minutes'] = local_mins[from_pos]
+
+        # Cache per-category index and speed arrays so the fastest/slowest
+        # lookups below are single argmin/argmax calls
+        cats['to_idx'] = self._commute_idx[to_mask]
+        cats['from_idx'] = self._commute_idx[~to_mask]
+        cats['to_speeds'] = self._compute_speeds(cats['to_idx'])
+        cats['from_speeds'] = self._compute_speeds(cats['from_idx'])
+
+        # Rank each category by elapsed time once; the fastest/slowest pair
+        # reads the ends of the ranking, and any future top-k report is an
+        # O(1) slice of the same order array
+        if len(cats['to_idx']):
+            to_elapsed = self._arrs['elapsed_time'][cats['to_idx']]
+            cats['to_order'] = np.argsort(to_elapsed, kind='stable')
+            cats['to_extremes'] = (int(cats['to_order'][0]), int(to_elapsed.argmax()))
+        if len(cats['from_idx']):
+            from_elapsed = self._arrs['elapsed_time'][cats['from_idx']]
+            cats['from_order'] = np.argsort(from_elapsed, kind='stable')
+            cats['from_extremes'] = (int(cats['from_order'][0]), int(from_elapsed.argmax()))
+
+        return cats
+
+    @property
+    def to_work_departure_times(self):
+        return self._categories['to_departures']
+
+    @property
+    def from_work_departure_times(self):
+        return self._categories['from_departures']
+
+    def _make_departure(self, activity_id, utc_sec, local_sec):
+        """Build the DepartureTime record for a commute's local start time"""
+        local_dt = _EPOCH + timedelta(seconds=local_sec)
+        return DepartureTime(
+            datetime=local_dt,
+            time_string=self._format_time_of_day(local_dt),
+            activity_id=activity_id,
+            date=self._format_date(utc_sec)
+        )
     
     def _meters_to_miles(self, meters):
         """Convert meters to miles"""
-        return meters * 0.000621371
+        return meters * _M_TO_MI
     
     def _average_time_of_day(self, departure_times):
         """Calculate the average time of day from a list of departure times"""
         if not departure_times:
             return None
-            
-        # Convert times to minutes since midnight for averaging
-        minutes_list = [(dt.datetime.hour * 60 + dt.datetime.minute) for dt in departure_times]
-        avg_minutes = sum(minutes_list) / len(minutes_list)
-        
-        # Convert back to hours and minutes
-        hours = int(avg_minutes // 60)
-        minutes = int(avg_minutes % 60)
-        
-        # Create a time object for formatting
-        avg_time = time(hour=hours, minute=minutes)
-        return avg_time.strftime('%-I:%M %p')
+
+        avg_minutes = self._departure_minutes(departure_times).mean()
+
+        # Truncating to whole minutes indexes straight into the table
+        return _TOD_TABLE[int(avg_minutes)]
     
+    def _departure_minutes(self, departure_times):
+        """Minutes-since-midnight for each departure as an int16 array.
+
+        The category lists built in _categories come with precomputed
+        arrays; only foreign lists pay the per-element extraction.
+        """
+        cats = self._categories
+        if departure_times is cats['to_departures']:
+            return cats['to_minutes']
+        if departure_times is cats['from_departures']:
+            return cats['from_minutes']
+        return np.fromiter(
+            (d.datetime.hour * 60 + d.datetime.minute for d in departure_times),
+            dtype=np.int16, count=len(departure_times),
+        )
+
+    def _departure_extremes(self, departure_times):
+        """Earliest and latest departure times via vectorized argmin/argmax"""
+        if not departure_times:
+            return None, None
+
+        minutes = self._departure_minutes(departure_times)
+        return (departure_times[int(minutes.argmin())],
+                departure_times[int(minutes.argmax())])
+
     def get_earliest_departure(self, departure_times):
         """Get the earliest departure time"""
-        if not departure_times:
-            return None
-        return min(departure_times, key=lambda x: x.datetime.hour * 60 + x.datetime.minute)
-    
+        return self._departure_extremes(departure_times)[0]
+
     def get_latest_departure(self, departure_times):
         """Get the latest departure time"""
-        if not departure_times:
-            return None
-        return max(departure_times, key=lambda x: x.datetime.hour * 60 + x.datetime.minute)
+        return self._departure_extremes(departure_times)[1]
     
+    @cached_property
     def total_commutes(self):
         """Get total number of commutes"""
-        return len(self.commutes)
+        return len(self._commute_idx)
     
+    @cached_property
     def total_distance_miles(self):
         """Get total distance of all commutes in miles"""
-        total_meters = sum(c['distance'] for c in self.commutes)
+        total_meters = self._categories['to_stats']['distance'] + self._categories['from_stats']['distance']
         return self._meters_to_miles(total_meters)
-    
+
+    @cached_property
     def total_elapsed_time(self):
         """Get total elapsed time of all commutes in minutes"""
-        total_seconds = sum(c['elapsed_time'] for c in self.commutes)
+        total_seconds = self._categories['to_stats']['elapsed_time'] + self._categories['from_stats']['elapsed_time']
         return total_seconds / 60  # Convert to minutes
-    
-    def average_commute_to_work(self):
-        """Calculate average commute to work in miles and minutes"""
-        if not self.to_work_commutes:
+
+    def _average_commute(self, stats):
+        """Average distance/moving/elapsed time from pre-accumulated sums"""
+        if stats['n'] == 0:
             return 0, 0, 0
-        
-        total_distance = sum(c['distance'] for c in self.to_work_commutes)
-        total_moving_time = sum(c['moving_time'] for c in self.to_work_commutes)
-        total_elapsed_time = sum(c['elapsed_time'] for c in self.to_work_commutes)
-        
-        avg_distance = self._meters_to_miles(total_distance / len(self.to_work_commutes))
-        avg_moving_time = total_moving_time / len(self.to_work_commutes) / 60  # Convert to minutes
-        avg_elapsed_time = total_elapsed_time / len(self.to_work_commutes) / 60  # Convert to minutes
-        
+
+        avg_distance = self._meters_to_miles(stats['distance'] / stats['n'])
+        avg_moving_time = stats['moving_time'] / stats['n'] / 60  # Convert to minutes
+        avg_elapsed_time = stats['elapsed_time'] / stats['n'] / 60  # Convert to minutes
+
         return avg_distance, avg_moving_time, avg_elapsed_time
-    
+
+    @cached_property
+    def average_commute_to_work(self):
+        """Calculate average commute to work in miles and minutes"""
+        return self._average_commute(self._categories['to_stats'])
+
+    @cached_property
     def average_commute_from_work(self):
         """Calculate average commute from work in miles and minutes"""
-        if not self.from_work_commutes:
-            return 0, 0, 0
-        
-        total_distance = sum(c['distance'] for c in self.from_work_commutes)
-        total_moving_time = sum(c['moving_time'] for c in self.from_work_commutes)
-        total_elapsed_time = sum(c['elapsed_time'] for c in self.from_work_commutes)
-        
-        avg_distance = self._meters_to_miles(total_distance / len(self.from_work_commutes))
-        avg_moving_time = total_moving_time / len(self.from_work_commutes) / 60  # Convert to minutes
-        avg_elapsed_time = total_elapsed_time / len(self.from_work_commutes) / 60  # Convert to minutes
-        
-        return avg_distance, avg_moving_time, avg_elapsed_time
-    
-    def _calculate_speed(self, commute):
-        """Calculate speed in mph for a commute using moving time"""
-        if commute['moving_time'] == 0:
-            return 0
-        
-        distance_miles = self._meters_to_miles(commute['distance'])
-        time_hours = commute['moving_time'] / 3600
-        return distance_miles / time_hours
-    
-    def _calculate_elapsed_time_minutes(self, commute):
-        """Calculate elapsed time in minutes for a commute"""
-        return commute['elapsed_time'] / 60
+        return self._average_commute(self._categories['from_stats'])
     
+    def _compute_speeds(self, idx):
+        """Calculate speeds in mph for the given activity indices, vectorized"""
+        moving_time = self._arrs['moving_time'][idx]
+        # One fused multiply/divide per element instead of two conversions
+        return np.where(moving_time > 0,
+                        self._arrs['distance'][idx] * _M_PER_S_TO_MPH
+                        / np.where(moving_time > 0, moving_time, 1),
+                        0.0)
+
+    def _summarize_commute(self, i, speed):
+        """Build the CommuteSummary for the commute at array index i"""
+        arrs = self._arrs
+        activity_id = int(arrs['id'][i])
+        moving_time_mins = float(arrs['moving_time'][i]) / 60
+        elapsed_time_mins = float(arrs['elapsed_time'][i]) / 60
+
+        return CommuteSummary(
+            id=activity_id,
+            date=self._format_date(int(arrs['start'][i].astype(np.int64))),
+            distance=self._meters_to_miles(float(arrs['distance'][i])),
+            moving_time=moving_time_mins,
+            moving_time_formatted=self._format_time(moving_time_mins),
+            elapsed_time=elapsed_time_mins,
+            elapsed_time_formatted=self._format_time(elapsed_time_mins),
+            stop_time=elapsed_time_mins - moving_time_mins,
+            stop_time_formatted=self._format_time(elapsed_time_mins - moving_time_mins),
+            speed=speed,
+            link=_STRAVA_ACTIVITY_URL(activity_id),
+        )
+
+    def _extreme_summary(self, side, which):
+        """Summary for one end ('to'/'from', 0=fastest/1=slowest) of a
+        category's elapsed-time ranking"""
+        cats = self._categories
+        extremes = cats[f'{side}_extremes']
+        if extremes is None:
+            return None
+
+        i = extremes[which]
+        return self._summarize_commute(int(cats[f'{side}_idx'][i]),
+                                       float(cats[f'{side}_speeds'][i]))
+
+    @cached_property
     def fastest_commute_to_work(self):
         """Find the commute to work with shortest elapsed time"""
-        if not self.to_work_commutes:
-            return None
-        
-        # Sort by elapsed time (ascending)
-        fastest = min(self.to_work_commutes, key=self._calculate_elapsed_time_minutes)
-        moving_time_mins = fastest['moving_time'] / 60
-        elapsed_time_mins = fastest['elapsed_time'] / 60
-        
-        return {
-            'id': fastest['id'],
-            'date': self._format_date(fastest['start_date']),
-            'distance': self._meters_to_miles(fastest['distance']),
-            'moving_time': moving_time_mins,
-            'moving_time_formatted': self._format_time(moving_time_mins),
-            'elapsed_time': elapsed_time_mins,
-            'elapsed_time_formatted': self._format_time(elapsed_time_mins),
-            'stop_time': elapsed_time_mins - moving_time_mins,
-            'stop_time_formatted': self._format_time(elapsed_time_mins - moving_time_mins),
-            'speed': self._calculate_speed(fastest),
-            'link': f"https://www.strava.com/activities/{fastest['id']}"
-        }
-    
+        return self._extreme_summary('to', 0)
+
+    @cached_property
     def slowest_commute_to_work(self):
         """Find the commute to work with longest elapsed time"""
-        if not self.to_work_commutes:
-            return None
-        
-        # Sort by elapsed time (descending)
-        slowest = max(self.to_work_commutes, key=self._calculate_elapsed_time_minutes)
-        moving_time_mins = slowest['moving_time'] / 60
-        elapsed_time_mins = slowest['elapsed_time'] / 60
-        
-        return {
-            'id': slowest['id'],
-            'date': self._format_date(slowest['start_date']),
-            'distance': self._meters_to_miles(slowest['distance']),
-            'moving_time': moving_time_mins,
-            'moving_time_formatted': self._format_time(moving_time_mins),
-            'elapsed_time': elapsed_time_mins,
-            'elapsed_time_formatted': self._format_time(elapsed_time_mins),
-            'stop_time': elapsed_time_mins - moving_time_mins,
-            'stop_time_formatted': self._format_time(elapsed_time_mins - moving_time_mins),
-            'speed': self._calculate_speed(slowest),
-            'link': f"https://www.strava.com/activities/{slowest['id']}"
-        }
-    
+        return self._extreme_summary('to', 1)
+
+    @cached_property
     def fastest_commute_from_work(self):
         """Find the commute from work with shortest elapsed time"""
-        if not self.from_work_commutes:
-            return None
-        
-        # Sort by elapsed time (ascending)
-        fastest = min(self.from_work_commutes, key=self._calculate_elapsed_time_minutes)
-        moving_time_mins = fastest['moving_time'] / 60
-        elapsed_time_mins = fastest['elapsed_time'] / 60
-        
-        return {
-            'id': fastest['id'],
-            'date': self._format_date(fastest['start_date']),
-            'distance': self._meters_to_miles(fastest['distance']),
-            'moving_time': moving_time_mins,
-            'moving_time_formatted': self._format_time(moving_time_mins),
-            'elapsed_time': elapsed_time_mins,
-            'elapsed_time_formatted': self._format_time(elapsed_time_mins),
-            'stop_time': elapsed_time_mins - moving_time_mins,
-            'stop_time_formatted': self._format_time(elapsed_time_mins - moving_time_mins),
-            'speed': self._calculate_speed(fastest),
-            'link': f"https://www.strava.com/activities/{fastest['id']}"
-        }
-    
+        return self._extreme_summary('from', 0)
+
+    @cached_property
     def slowest_commute_from_work(self):
         """Find the commute from work with longest elapsed time"""
-        if not self.from_work_commutes:
-            return None
-        
-        # Sort by elapsed time (descending)
-        slowest = max(self.from_work_commutes, key=self._calculate_elapsed_time_minutes)
-        moving_time_mins = slowest['moving_time'] / 60
-        elapsed_time_mins = slowest['elapsed_time'] / 60
-        
-        return {
-            'id': slowest['id'],
-            'date': self._format_date(slowest['start_date']),
-            'distance': self._meters_to_miles(slowest['distance']),
-            'moving_time': moving_time_mins,
-            'moving_time_formatted': self._format_time(moving_time_mins),
-            'elapsed_time': elapsed_time_mins,
-            'elapsed_time_formatted': self._format_time(elapsed_time_mins),
-            'stop_time': elapsed_time_mins - moving_time_mins,
-            'stop_time_formatted': self._format_time(elapsed_time_mins - moving_time_mins),
-            'speed': self._calculate_speed(slowest),
-            'link': f"https://www.strava.com/activities/{slowest['id']}"
-        }
+        return self._extreme_summary('from', 1)
     
     def generate_analysis_text(self):
         """Generate text for commute analysis"""
-        lines = []
-        lines.append("\n===== STRAVA COMMUTE ANALYSIS =====\n")
-        lines.append(f"Analysis for commutes from {self.start_year} onwards\n")
-        
-        lines.append(f"Total number of commutes: {self.total_commutes()}")
-        lines.append(f"Total distance of commutes: {self.total_distance_miles():.2f} miles")
-        lines.append(f"Total elapsed time of commutes: {self._format_time(self.total_elapsed_time())}")
+        # StringIO grows amortized in place; no final O(total_len) join copy
+        buf = io.StringIO()
+        buf.write(_REPORT_HEADER_TMPL.format(
+            start_year=self.start_year,
+            total_commutes=self.total_commutes,
+            total_distance=self.total_distance_miles,
+            total_elapsed=self._format_time(self.total_elapsed_time),
+        ))
 
         # Add average departure times
         avg_to_work_time = self._average_time_of_day(self.to_work_departure_times)
         if avg_to_work_time:
-            lines.append(f"\nAverage departure time TO work: {avg_to_work_time}")
-            
+            buf.write(f"\n\nAverage departure time TO work: {avg_to_work_time}")
+
         avg_from_work_time = self._average_time_of_day(self.from_work_departure_times)
         if avg_from_work_time:
-            lines.append(f"Average departure time FROM work: {avg_from_work_time}")
-        
-        # Add earliest and latest departure times for to-work commutes
-        earliest_to_work = self.get_earliest_departure(self.to_work_departure_times)
-        if earliest_to_work:
-            lines.append(f"\nEarliest departure TO work: {earliest_to_work.time_string}")
-            lines.append(f"  Date: {earliest_to_work.date}")
-            lines.append(f"  Link: https://www.strava.com/activities/{earliest_to_work.activity_id}")
-            
-        latest_to_work = self.get_latest_departure(self.to_work_departure_times)
-        if latest_to_work:
-            lines.append(f"\nLatest departure TO work: {latest_to_work.time_string}")
-            lines.append(f"  Date: {latest_to_work.date}")
-            lines.append(f"  Link: https://www.strava.com/activities/{latest_to_work.activity_id}")
-            
-        # Add earliest and latest departure times for from-work commutes
-        earliest_from_work = self.get_earliest_departure(self.from_work_departure_times)
-        if earliest_from_work:
-            lines.append(f"\nEarliest departure FROM work: {earliest_from_work.time_string}")
-            lines.append(f"  Date: {earliest_from_work.date}")
-            lines.append(f"  Link: https://www.strava.com/activities/{earliest_from_work.activity_id}")
-            
-        latest_from_work = self.get_latest_departure(self.from_work_departure_times)
-        if latest_from_work:
-            lines.append(f"\nLatest departure FROM work: {latest_from_work.time_string}")
-            lines.append(f"  Date: {latest_from_work.date}")
-            lines.append(f"  Link: https://www.strava.com/activities/{latest_from_work.activity_id}")
-        
-        to_work_distance, to_work_moving_time, to_work_elapsed_time = self.average_commute_to_work()
-        lines.append(f"\nAverage commute TO work:")
-        lines.append(f"  Distance: {to_work_distance:.2f} miles")
-        lines.append(f"  Moving time: {self._format_time(to_work_moving_time)}")
-        lines.append(f"  Elapsed time: {self._format_time(to_work_elapsed_time)}")
-        lines.append(f"  Stop time: {self._format_time(to_work_elapsed_time - to_work_moving_time)}")
-        
-        from_work_distance, from_work_moving_time, from_work_elapsed_time = self.average_commute_from_work()
-        lines.append(f"\nAverage commute FROM work:")
-        lines.append(f"  Distance: {from_work_distance:.2f} miles")
-        lines.append(f"  Moving time: {self._format_time(from_work_moving_time)}")
-        lines.append(f"  Elapsed time: {self._format_time(from_work_elapsed_time)}")
-        lines.append(f"  Stop time: {self._format_time(from_work_elapsed_time - from_work_moving_time)}")
-        
-        fastest_to = self.fastest_commute_to_work()
-        if fastest_to:
-            lines.append(f"\nQuickest commute TO work (by elapsed time): {fastest_to['elapsed_time_formatted']}")
-            lines.append(f"  Date: {fastest_to['date']}")
-            lines.append(f"  Distance: {fastest_to['distance']:.2f} miles")
-            lines.append(f"  Moving time: {fastest_to['moving_time_formatted']}")
-            lines.append(f"  Elapsed time: {fastest_to['elapsed_time_formatted']}")
-            lines.append(f"  Stop time: {fastest_to['stop_time_formatted']}")
-            lines.append(f"  Link: {fastest_to['link']}")
-        
-        slowest_to = self.slowest_commute_to_work()
-        if slowest_to:
-            lines.append(f"\nLongest commute TO work (by elapsed time): {slowest_to['elapsed_time_formatted']}")
-            lines.append(f"  Date: {slowest_to['date']}")
-            lines.append(f"  Distance: {slowest_to['distance']:.2f} miles")
-            lines.append(f"  Moving time: {slowest_to['moving_time_formatted']}")
-            lines.append(f"  Elapsed time: {slowest_to['elapsed_time_formatted']}")
-            lines.append(f"  Stop time: {slowest_to['stop_time_formatted']}")
-            lines.append(f"  Link: {slowest_to['link']}")
-        
-        fastest_from = self.fastest_commute_from_work()
-        if fastest_from:
-            lines.append(f"\nQuickest commute FROM work (by elapsed time): {fastest_from['elapsed_time_formatted']}")
-            lines.append(f"  Date: {fastest_from['date']}")
-            lines.append(f"  Distance: {fastest_from['distance']:.2f} miles")
-            lines.append(f"  Moving time: {fastest_from['moving_time_formatted']}")
-            lines.append(f"  Elapsed time: {fastest_from['elapsed_time_formatted']}")
-            lines.append(f"  Stop time: {fastest_from['stop_time_formatted']}")
-            lines.append(f"  Link: {fastest_from['link']}")
-        
-        slowest_from = self.slowest_commute_from_work()
-        if slowest_from:
-            lines.append(f"\nLongest commute FROM work (by elapsed time): {slowest_from['elapsed_time_formatted']}")
-            lines.append(f"  Date: {slowest_from['date']}")
-            lines.append(f"  Distance: {slowest_from['distance']:.2f} miles")
-            lines.append(f"  Moving time: {slowest_from['moving_time_formatted']}")
-            lines.append(f"  Elapsed time: {slowest_from['elapsed_time_formatted']}")
-            lines.append(f"  Stop time: {slowest_from['stop_time_formatted']}")
-            lines.append(f"  Link: {slowest_from['link']}")
-        
-        lines.append("\n===================================\n")
-        
-        return "\n".join(lines)
-    
+            buf.write(f"\nAverage departure time FROM work: {avg_from_work_time}")
+
+        # Add earliest and latest departure times for each category
+        for direction, departures in (('TO', self.to_work_departure_times),
+                                      ('FROM', self.from_work_departure_times)):
+            earliest, latest = self._departure_extremes(departures)
+            for label, departure in (('Earliest', earliest), ('Latest', latest)):
+                if departure:
+                    buf.write(_DEPARTURE_TMPL.format(
+                        label=label, direction=direction,
+                        time_string=departure.time_string,
+                        date=departure.date,
+                        activity_id=departure.activity_id,
+                    ))
+
+        for direction, averages in (('TO', self.average_commute_to_work),
+                                    ('FROM', self.average_commute_from_work)):
+            distance, moving_time, elapsed_time = averages
+            buf.write(_AVG_COMMUTE_TMPL.format(
+                direction=direction,
+                distance=distance,
+                moving=self._format_time(moving_time),
+                elapsed=self._format_time(elapsed_time),
+                stop=self._format_time(elapsed_time - moving_time),
+            ))
+
+        for label, direction, summary in (
+                ('Quickest', 'TO', self.fastest_commute_to_work),
+                ('Longest', 'TO', self.slowest_commute_to_work),
+                ('Quickest', 'FROM', self.fastest_commute_from_work),
+                ('Longest', 'FROM', self.slowest_commute_from_work)):
+            if summary:
+                buf.write(_EXTREME_TMPL.format(label=label, direction=direction, s=summary))
+
+        buf.write(_REPORT_FOOTER)
+
+        return buf.getvalue()
+
     def print_commute_analysis(self):
         """Print a text-based analysis of commutes"""
+        # One format pass: the same string is written to stdout and to disk
         analysis_text = self.generate_analysis_text()
-        print(analysis_text)
+        sys.stdout.write(analysis_text)
+        sys.stdout.write('\n')
         self.save_analysis_to_file(analysis_text)
     
     def save_analysis_to_file(self, analysis_text, filename=None):
@@ -426,9 +584,12 @@ class CommuteAnalyzer:
         if filename is None:
             # Use a fixed filename that will be overwritten each time
             filename = "output/commute_analysis.txt"
-        
-        # Create output directory if it doesn't exist
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+        # Create the output directory once per analyzer, not once per write
+        out_dir = os.path.dirname(filename)
+        if out_dir and out_dir not in self._prepared_dirs:
+            os.makedirs(out_dir, exist_ok=True)
+            self._prepared_dirs.add(out_dir)
         
         # Write analysis to file
         with open(filename, 'w') as f:
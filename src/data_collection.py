@@ -1,8 +1,12 @@
 import os
-import json
+import orjson
 import requests
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from dotenv import load_dotenv
 
 # Configure logging
@@ -25,7 +29,7 @@ class StravaDataCollector:
         self.client_secret = os.getenv('STRAVA_CLIENT_SECRET')
         self.refresh_token = os.getenv('STRAVA_REFRESH_TOKEN')
         self.access_token = None
-        self.activities = []
+        self.buffer_file = 'data/activities.ndjson'
         self.existing_activities = []
         
         # Validate environment variables
@@ -56,8 +60,8 @@ class StravaDataCollector:
         """Load existing activities from file if it exists"""
         try:
             if os.path.exists(filename):
-                with open(filename, 'r') as f:
-                    self.existing_activities = json.load(f)
+                with open(filename, 'rb') as f:
+                    self.existing_activities = orjson.loads(f.read())
                 logger.info(f"Loaded {len(self.existing_activities)} existing activities from {filename}")
             else:
                 logger.info(f"No existing activities file found at {filename}")
@@ -76,35 +80,76 @@ class StravaDataCollector:
         one_month_ago = datetime.now() - timedelta(days=30)
         after_timestamp = int(one_month_ago.timestamp())
         
-        headers = {'Authorization': f'Bearer {self.access_token}'}
-        page = 1
+        session = requests.Session()
+        session.headers['Authorization'] = f'Bearer {self.access_token}'
+        # Retries honor Retry-After on 429s instead of abandoning the run
+        # and replaying every page on the next one
+        session.mount('https://', HTTPAdapter(
+            max_retries=Retry(total=3, backoff_factor=0.5,
+                              status_forcelist=[429, 500, 502, 503],
+                              allowed_methods=['GET']),
+            pool_maxsize=8,
+        ))
         total_activities = 0
         
-        while page <= max_pages:
+        def fetch_page(page):
             logger.info(f"Fetching page {page} of activities...")
-            response = requests.get(
+            response = session.get(
                 'https://www.strava.com/api/v3/athlete/activities',
-                headers=headers,
                 params={
                     'per_page': per_page, 
                     'page': page,
                     'after': after_timestamp
                 }
             )
-            
             if response.status_code != 200:
                 logger.error(f"Error fetching page {page}. Status code: {response.status_code}")
-                break
-                
-            activities = response.json()
-            if not activities:
-                logger.info("No more activities to fetch")
-                break
-                
-            self.activities.extend(activities)
-            total_activities += len(activities)
-            logger.info(f"Successfully fetched {len(activities)} activities from page {page}")
-            page += 1
+                return None, response.headers
+            return response.json(), response.headers
+        
+        def quota_wait(headers):
+            """Seconds to pause so the next window fits in the 15-min quota"""
+            usage = headers.get('X-RateLimit-Usage')
+            limit = headers.get('X-RateLimit-Limit')
+            if not usage or not limit:
+                return 0
+            used = int(usage.split(',')[0])
+            cap = int(limit.split(',')[0])
+            if cap - used < 8:
+                return 900 - (time.time() % 900)
+            return 0
+        
+        # Fetch pages concurrently in windows of 8 - pagination is
+        # deterministic and the Strava rate limit is per-minute, not
+        # per-connection, so overlapping the request RTTs is safe.
+        # Stream each page straight to an NDJSON buffer so memory stays
+        # constant no matter how much history the account has
+        os.makedirs(os.path.dirname(self.buffer_file), exist_ok=True)
+        with open(self.buffer_file, 'wb') as buffer, \
+                ThreadPoolExecutor(max_workers=8) as executor:
+            page = 1
+            done = False
+            while page <= max_pages and not done:
+                window = range(page, min(page + 8, max_pages + 1))
+                headers = {}
+                for page_num, (activities, headers) in zip(window, executor.map(fetch_page, window)):
+                    if not activities:
+                        if activities is not None:
+                            logger.info("No more activities to fetch")
+                        done = True
+                        break
+                    for activity in activities:
+                        buffer.write(orjson.dumps(activity) + b'\n')
+                    total_activities += len(activities)
+                    logger.info(f"Successfully fetched {len(activities)} activities from page {page_num}")
+                    if len(activities) < per_page:
+                        done = True
+                        break
+                page = window.stop
+                wait = quota_wait(headers) if not done else 0
+                if wait:
+                    logger.info(f"Rate-limit quota nearly exhausted; sleeping {wait:.0f}s")
+                    time.sleep(wait)
 
         logger.info(f"Completed fetching activities. Total activities collected: {total_activities}")
 
@@ -117,25 +162,33 @@ class StravaDataCollector:
         updated_count = 0
         new_count = 0
         
-        # Process new activities - update existing ones or add new ones
-        for activity in self.activities:
-            if activity['id'] in existing_dict:
-                # Update existing activity
-                existing_dict[activity['id']] = activity
-                updated_count += 1
-            else:
-                # Add new activity
-                existing_dict[activity['id']] = activity
-                new_count += 1
+        # Process new activities - update existing ones or add new ones,
+        # reading the fetch buffer one record at a time
+        if os.path.exists(self.buffer_file):
+            with open(self.buffer_file, 'rb') as buffer:
+                for line in buffer:
+                    activity = orjson.loads(line)
+                    if activity['id'] in existing_dict:
+                        updated_count += 1
+                    else:
+                        new_count += 1
+                    existing_dict[activity['id']] = activity
+            os.remove(self.buffer_file)
         
         # Convert back to list
         updated_activities = list(existing_dict.values())
         
-        # Save to file
+        # Save to file, one record per write so peak memory stays at a
+        # single serialized activity rather than the whole indented document
         try:
             os.makedirs(os.path.dirname(filename), exist_ok=True)
-            with open(filename, 'w') as f:
-                json.dump(updated_activities, f, indent=2)
+            with open(filename, 'wb') as f:
+                f.write(b'[\n')
+                for i, activity in enumerate(updated_activities):
+                    if i:
+                        f.write(b',\n')
+                    f.write(orjson.dumps(activity))
+                f.write(b'\n]')
             logger.info(f"Successfully saved {len(updated_activities)} activities to {filename}")
             logger.info(f"Updated {updated_count} existing activities and added {new_count} new activities")
         except Exception as e:
@@ -1,12 +1,17 @@
-import json
+import orjson
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pytz
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
 
+_DAY_NAMES = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday',
+                       'Friday', 'Saturday', 'Sunday'])
+
 class InteractiveStravaVisualizer:
     def __init__(self, data_file='data/activities.json'):
         self.data_file = data_file
@@ -15,32 +20,67 @@ class InteractiveStravaVisualizer:
         self.df = self._prepare_dataframe()
 
     def _load_data(self):
-        with open(self.data_file, 'r') as f:
-            return json.load(f)
+        with open(self.data_file, 'rb') as f:
+            return orjson.loads(f.read())
 
     def _prepare_dataframe(self):
         df = pd.DataFrame(self.activities)
-        df['start_date'] = pd.to_datetime(df['start_date']).dt.tz_convert(self.timezone)
-        df['distance_miles'] = df['distance'] * 0.000621371  # Convert meters to miles
-        df['moving_time_hours'] = df['moving_time'] / 3600
-        df['elevation_gain_ft'] = df['total_elevation_gain'] * 3.28084  # Convert meters to feet
-        df['speed_mph'] = df['distance_miles'] / df['moving_time_hours']  # Speed in mph
-        df['year'] = df['start_date'].dt.year
-        df['month'] = df['start_date'].dt.month
-        df['day_of_week'] = df['start_date'].dt.day_name()
-        df['hour'] = df['start_date'].dt.hour
-        df['date'] = df['start_date'].dt.date
+        # The fixed format string hits pandas' C fast path instead of
+        # per-string format inference
+        df['start_date'] = pd.to_datetime(
+            df['start_date'], format='%Y-%m-%dT%H:%M:%SZ', utc=True
+        ).dt.tz_convert(self.timezone)
+        # float32 everywhere: these are display quantities, and halving the
+        # element size halves memory traffic through every downstream agg
+        distance_miles = df['distance'].to_numpy(np.float32) * np.float32(0.000621371)  # Convert meters to miles
+        moving_time_hours = df['moving_time'].to_numpy(np.float32) / np.float32(3600)
+        df['distance_miles'] = distance_miles
+        df['moving_time_hours'] = moving_time_hours
+        df['elevation_gain_ft'] = df['total_elevation_gain'].to_numpy(np.float32) * np.float32(3.28084)  # Convert meters to feet
+        # Guarded divide: zero moving time yields 0 mph instead of inf
+        speed_mph = np.zeros_like(distance_miles)
+        np.divide(distance_miles, moving_time_hours, out=speed_mph, where=moving_time_hours > 0)
+        df['speed_mph'] = speed_mph
+
+        # Derive all calendar columns from one integer view of the local
+        # timestamps instead of a separate .dt kernel dispatch per column
+        naive = df['start_date'].dt.tz_localize(None)
+        secs = naive.to_numpy().astype('datetime64[s]').astype('int64')
+        epoch_days = secs // 86400
+        df['hour'] = ((secs // 3600) % 24).astype('int8')
+        # 1970-01-01 was a Thursday: index 3 with Monday = 0. The int8 index
+        # makes weekday tests a single compare; the name column is for display
+        df['dow_idx'] = ((epoch_days + 3) % 7).astype('int8')
+        df['day_of_week'] = pd.Categorical.from_codes(
+            df['dow_idx'], categories=list(_DAY_NAMES), ordered=True)
+        # Low-cardinality strings: categorical codes make every groupby and
+        # comparison on activity type hash int8 codes, not string pointers
+        df['type'] = df['type'].astype('category')
+        # Integer days-since-epoch instead of .dt.date: the column is only a
+        # groupby count key, and boxing every timestamp into a Python date
+        # object is ~50x slower and stores object pointers instead of int32
+        df['date'] = epoch_days.astype('int32')
+        # Months-since-epoch integer key: year, month, and the monthly
+        # groupby bucket all come from one datetime64[M] cast, and the
+        # groupby hashes int32 keys instead of Period objects
+        months = naive.to_numpy().astype('datetime64[M]').astype('int64')
+        df['year'] = (months // 12 + 1970).astype('int32')
+        df['month'] = (months % 12 + 1).astype('int8')
+        df['ym'] = months.astype('int32')
         return df
 
     def create_activity_bubble_chart(self):
         """Create an interactive bubble chart of activities with filters"""
-        activity_groups = self.df.groupby('type').agg({
-            'distance_miles': 'sum',
-            'moving_time_hours': 'sum',
-            'elevation_gain_ft': 'sum',
-            'speed_mph': 'mean',
-            'date': 'count'
-        }).reset_index()
+        # Named aggregations dispatch with less per-column overhead than a
+        # dict of aggs, and observed=True keeps the categorical groupby from
+        # enumerating unseen categories
+        activity_groups = self.df.groupby('type', observed=True).agg(
+            distance_miles=('distance_miles', 'sum'),
+            moving_time_hours=('moving_time_hours', 'sum'),
+            elevation_gain_ft=('elevation_gain_ft', 'sum'),
+            speed_mph=('speed_mph', 'mean'),
+            date=('date', 'count'),
+        ).reset_index()
 
         fig = px.scatter(
             activity_groups,
@@ -102,33 +142,18 @@ class InteractiveStravaVisualizer:
 
     def create_time_distribution_chart(self):
         """Create an interactive polar chart of activity times with filters"""
-        hourly_counts = (
-            self.df['hour']
-            .value_counts()
-            .reindex(range(24), fill_value=0)
-            .sort_index()
-        )
-
-        weekday_counts = (
-            self.df[self.df['day_of_week'].isin(
-                ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-            )]['hour']
-            .value_counts()
-            .reindex(range(24), fill_value=0)
-            .sort_index()
-        )
-
-        weekend_counts = (
-            self.df[self.df['day_of_week'].isin(['Saturday', 'Sunday'])]['hour']
-            .value_counts()
-            .reindex(range(24), fill_value=0)
-            .sort_index()
-        )
+        # The hour domain is bounded [0, 24), so a single np.bincount C loop
+        # replaces each value_counts/reindex/sort pipeline
+        hours = self.df['hour'].to_numpy(np.int64)
+        weekday_mask = self.df['dow_idx'].to_numpy() < 5
+        hourly_counts = np.bincount(hours, minlength=24)
+        weekday_counts = np.bincount(hours[weekday_mask], minlength=24)
+        weekend_counts = np.bincount(hours[~weekday_mask], minlength=24)
         
         fig = go.Figure()
         
         fig.add_trace(go.Barpolar(
-            r=hourly_counts.values,
+            r=hourly_counts,
             theta=[i * 15 for i in range(24)],
             name='Activities',
             marker_color='rgb(158,202,225)',
@@ -167,17 +192,17 @@ class InteractiveStravaVisualizer:
                         dict(
                             label="All Days",
                             method="update",
-                            args=[{"r": [hourly_counts.values]}]
+                            args=[{"r": [hourly_counts]}]
                         ),
                         dict(
                             label="Weekdays",
                             method="update",
-                            args=[{"r": [weekday_counts.values]}]
+                            args=[{"r": [weekday_counts]}]
                         ),
                         dict(
                             label="Weekends",
                             method="update",
-                            args=[{"r": [weekend_counts.values]}]
+                            args=[{"r": [weekend_counts]}]
                         )
                     ]),
                 )
@@ -188,7 +213,7 @@ class InteractiveStravaVisualizer:
 
     def create_monthly_stats_chart(self):
         """Create an interactive monthly statistics chart with range slider"""
-        monthly_stats = self.df.groupby(self.df['start_date'].dt.to_period('M')).agg({
+        monthly_stats = self.df.groupby('ym').agg({
             'distance_miles': 'sum',
             'moving_time_hours': 'sum',
             'elevation_gain_ft': 'sum',
@@ -196,10 +221,13 @@ class InteractiveStravaVisualizer:
             'speed_mph': 'mean'
         }).reset_index()
         
-        monthly_stats['start_date'] = monthly_stats['start_date'].astype(str)
+        # Real timestamps keep plotly on the fast date-axis layout path
+        # instead of categorical strings
+        monthly_stats['start_date'] = monthly_stats['ym'].to_numpy(np.int64).astype('datetime64[M]')
         
         fig = make_subplots(
             rows=2, cols=1,
+            shared_xaxes=True,
             subplot_titles=('Monthly Distance and Elevation', 'Monthly Activity Count and Time'),
             vertical_spacing=0.15
         )
@@ -266,12 +294,8 @@ class InteractiveStravaVisualizer:
             template='plotly_white',
             showlegend=True,
             hovermode='x unified',
-            xaxis=dict(
-                rangeslider=dict(
-                    visible=True
-                ),
-                type="date"
-            ),
+            # One rangeslider on the shared bottom axis drives both rows,
+            # halving what plotly-js re-renders per zoom
             xaxis2=dict(
                 rangeslider=dict(
                     visible=True
@@ -284,25 +308,26 @@ class InteractiveStravaVisualizer:
 
     def create_activity_heatmap(self):
         """Create an interactive heatmap of activities by day and hour with filters"""
-        heatmap_data = pd.pivot_table(
-            self.df,
-            values='distance_miles',
-            index='hour',
-            columns='day_of_week',
-            aggfunc='count',
-            fill_value=0
-        )
-        
         days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        heatmap_data = heatmap_data[days]
+        
+        # The (hour, day) domain is a fixed 24x7 grid, so each heatmap is a
+        # bincount over packed integer keys instead of a pivot_table; the
+        # filter buttons reuse masked bincounts of the same key array
+        hours = self.df['hour'].to_numpy(np.int64)
+        dow_idx = self.df['dow_idx'].to_numpy(np.int64)
+        key = hours * 7 + dow_idx
+        types = self.df['type'].to_numpy()
+        all_z = np.bincount(key, minlength=168).reshape(24, 7)
+        run_z = np.bincount(key[types == 'Run'], minlength=168).reshape(24, 7)
+        ride_z = np.bincount(key[types == 'Ride'], minlength=168).reshape(24, 7)
         
         fig = go.Figure(data=go.Heatmap(
-            z=heatmap_data.values,
-            x=heatmap_data.columns,
-            y=heatmap_data.index,
+            z=all_z,
+            x=days,
+            y=list(range(24)),
             colorscale='YlOrRd',
             hoverongaps=False,
-            text=heatmap_data.values,
+            text=all_z,
             texttemplate='%{text}',
             textfont={"size": 10},
             hovertemplate="<b>Day:</b> %{x}<br>" +
@@ -328,29 +353,17 @@ class InteractiveStravaVisualizer:
                         dict(
                             label="All Activities",
                             method="update",
-                            args=[{"z": [heatmap_data.values]}]
+                            args=[{"z": [all_z]}]
                         ),
                         dict(
                             label="Running",
                             method="update",
-                            args=[{"z": [self.df[self.df['type'] == 'Run'].pivot_table(
-                                values='distance_miles',
-                                index='hour',
-                                columns='day_of_week',
-                                aggfunc='count',
-                                fill_value=0
-                            )[days].values]}]
+                            args=[{"z": [run_z]}]
                         ),
                         dict(
                             label="Cycling",
                             method="update",
-                            args=[{"z": [self.df[self.df['type'] == 'Ride'].pivot_table(
-                                values='distance_miles',
-                                index='hour',
-                                columns='day_of_week',
-                                aggfunc='count',
-                                fill_value=0
-                            )[days].values]}]
+                            args=[{"z": [ride_z]}]
                         )
                     ]),
                 )
@@ -363,21 +376,21 @@ class InteractiveStravaVisualizer:
         """Save all visualizations as HTML files"""
         os.makedirs('output', exist_ok=True)
         
-        # Save bubble chart
-        fig_bubble = self.create_activity_bubble_chart()
-        fig_bubble.write_html('output/activity_bubbles.html')
-        
-        # Save time distribution
-        fig_time = self.create_time_distribution_chart()
-        fig_time.write_html('output/time_distribution.html')
-        
-        # Save monthly stats
-        fig_monthly = self.create_monthly_stats_chart()
-        fig_monthly.write_html('output/monthly_stats.html')
+        figures = [
+            (self.create_activity_bubble_chart(), 'output/activity_bubbles.html'),
+            (self.create_time_distribution_chart(), 'output/time_distribution.html'),
+            (self.create_monthly_stats_chart(), 'output/monthly_stats.html'),
+            (self.create_activity_heatmap(), 'output/activity_heatmap.html'),
+        ]
         
-        # Save heatmap
-        fig_heatmap = self.create_activity_heatmap()
-        fig_heatmap.write_html('output/activity_heatmap.html')
+        # The four writes are independent and I/O-bound, so overlap them;
+        # referencing plotly.js from the CDN instead of inlining ~3MB of
+        # script per file is the bigger win for both size and write time
+        with ThreadPoolExecutor(max_workers=len(figures)) as executor:
+            list(executor.map(
+                lambda pair: pair[0].write_html(pair[1], include_plotlyjs='cdn'),
+                figures,
+            ))
         
         print("All interactive visualizations have been saved as HTML files in the output directory")
 
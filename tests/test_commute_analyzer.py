@@ -1,3 +1,8 @@
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
 from commute_analyzer import CommuteAnalyzer
 
 
@@ -32,3 +37,17 @@ def test_format_time_years_case():
     # 1 year 2 days = 365 days + 2 days
     minutes = (365 + 2) * 24 * 60
     assert ca._format_time(minutes) == "1y 2d"
+
+
+def test_local_seconds_near_dst_transition():
+    # 2024-03-10T09:30:00Z is 1:30 AM PST, shortly before the
+    # spring-forward transition at 10:00 UTC; resolving the offset from
+    # the local wall clock instead of the UTC instant reported 2:30 AM
+    ca = _make_analyzer()
+    ca.timezone = ZoneInfo("America/Los_Angeles")
+    ca._offset_cache = {}
+    utc_seconds = np.array(
+        [int(datetime(2024, 3, 10, 9, 30, tzinfo=timezone.utc).timestamp())],
+        dtype=np.int64)
+    local = ca._local_seconds(utc_seconds)
+    assert str(local.astype('datetime64[s]')[0]) == '2024-03-10T01:30:00'